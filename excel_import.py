@@ -0,0 +1,141 @@
+import logging
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ItemChange:
+    """An item as it will look once the upload is applied"""
+    id: int | None
+    name: str
+    description: str | None = None  # None means the description is unchanged
+    is_new: bool = False
+
+@dataclass
+class ImportPlan:
+    """Parameter lists for the bulk statements, plus the counts reported to the user"""
+    updates: list[dict] = field(default_factory=list)
+    inserts: list[dict] = field(default_factory=list)
+    upserts: list[dict] = field(default_factory=list)
+    renamed_ids: list[int] = field(default_factory=list)
+    imported_count: int = 0
+    updated_count: int = 0
+    skipped_count: int = 0
+
+def resolve_renames(target_names, owners):
+    """Return the IDs whose rename can be applied and the final name -> ID map
+
+    Renamed items release their old name, so swapping names between rows works.
+    A rename is rejected when another item would end up holding the same name;
+    the rejected item keeps its name, which can in turn reject other renames.
+    """
+    accepted_ids = set(target_names)
+    while True:
+        final_owners = {name: item_id for name, item_id in owners.items() if item_id not in accepted_ids}
+        rejected_ids = set()
+        for item_id, name in target_names.items():
+            if item_id not in accepted_ids:
+                continue
+            if final_owners.get(name, item_id) != item_id:
+                rejected_ids.add(item_id)
+            else:
+                final_owners[name] = item_id
+        if not rejected_ids:
+            return accepted_ids, final_owners
+        accepted_ids -= rejected_ids
+
+def plan_import(rows, current_names, owners):
+    """Work out how uploaded rows are applied without touching the database
+
+    rows are (row_num, item_id, name, description) tuples with item_id None for
+    name matching, current_names maps uploaded IDs that exist to their name and
+    owners maps uploaded names that exist to the ID holding them.
+    """
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    plan = ImportPlan()
+
+    # Last row for an existing ID decides its name
+    target_names = {}
+    for _, item_id, name, _ in rows:
+        if item_id in current_names:
+            target_names[item_id] = name
+    accepted_ids, owner_ids = resolve_renames(target_names, owners)
+
+    # Existing items by ID, and every item by the name it holds after the upload
+    existing = {}
+    final_owners = {}
+    for name, item_id in owner_ids.items():
+        existing[item_id] = final_owners[name] = ItemChange(id=item_id, name=name)
+
+    new_items = []
+    new_by_id = {}
+    for row_num, item_id, name, description in rows:
+        if item_id in current_names:
+            if item_id not in accepted_ids:
+                logger.warning("Row %d: name '%s' is already used by another item, skipping", row_num, name)
+                plan.skipped_count += 1
+                continue
+            # Update existing item by ID
+            existing[item_id].description = description
+            plan.updated_count += 1
+            if debug_enabled:
+                logger.debug("Updated item by ID %s: %s", item_id, name)
+        elif item_id in new_by_id:
+            # ID created earlier in this file, update the pending item
+            change = new_by_id[item_id]
+            if change.name != name:
+                if name in final_owners:
+                    logger.warning("Row %d: name '%s' is already used by another item, skipping", row_num, name)
+                    plan.skipped_count += 1
+                    continue
+                del final_owners[change.name]
+                change.name = name
+                final_owners[name] = change
+            change.description = description
+            plan.updated_count += 1
+            if debug_enabled:
+                logger.debug("Updated item by ID %s: %s", item_id, name)
+        elif item_id is not None and name not in final_owners:
+            # ID not found, create new item with specified ID
+            change = ItemChange(id=item_id, name=name, description=description, is_new=True)
+            new_items.append(change)
+            new_by_id[item_id] = final_owners[name] = change
+            plan.imported_count += 1
+            if debug_enabled:
+                logger.debug("Created new item with ID %s: %s", item_id, name)
+        else:
+            if item_id is not None:
+                logger.warning("Row %d: name '%s' is already used, ignoring ID %s and matching by name", row_num, name, item_id)
+            change = final_owners.get(name)
+            if change is None:
+                # Create new item
+                change = ItemChange(id=None, name=name, description=description, is_new=True)
+                new_items.append(change)
+                final_owners[name] = change
+                plan.imported_count += 1
+                if debug_enabled:
+                    logger.debug("Created new item: %s", name)
+            else:
+                # Update the item holding this name, existing or created earlier in this file
+                change.description = description
+                plan.updated_count += 1
+                if debug_enabled:
+                    logger.debug("Updated existing item by name: %s", name)
+
+    for change in existing.values():
+        params = {"id": change.id}
+        if change.id in current_names and change.name != current_names[change.id]:
+            params["name"] = change.name
+            plan.renamed_ids.append(change.id)
+        if change.description is not None:
+            params["description"] = change.description
+        if len(params) > 1:
+            plan.updates.append(params)
+
+    for change in new_items:
+        if change.id is not None:
+            plan.inserts.append({"id": change.id, "name": change.name, "description": change.description})
+        else:
+            plan.upserts.append({"name": change.name, "description": change.description})
+
+    return plan
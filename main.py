@@ -1,35 +1,104 @@
 # main.py
 from fastapi import FastAPI, Depends, HTTPException, Request, UploadFile, File
-from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 import openpyxl
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
 import io
 import tempfile
 import os
 import logging
+from contextlib import asynccontextmanager
 
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, delete, func, insert, inspect, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 import models, schemas
+from excel_import import plan_import
 from database import engine, Base, get_db
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
-Base.metadata.create_all(bind=engine)
+def ensure_unique_item_names(conn):
+    """Upgrade an items table created before Item.name was unique"""
+    name_index = next(index for index in models.Item.__table__.indexes if "name" in index.columns)
+    existing_indexes = {index["name"]: index for index in inspect(conn).get_indexes("items")}
+    if existing_indexes.get(name_index.name, {}).get("unique"):
+        return
+    
+    duplicate_names = conn.execute(
+        select(models.Item.name)
+        .where(models.Item.name.is_not(None))
+        .group_by(models.Item.name)
+        .having(func.count() > 1)
+        .limit(10)
+    ).scalars().all()
+    if duplicate_names:
+        raise RuntimeError(
+            f"Cannot add a unique index on items.name, duplicate names exist: {duplicate_names}. "
+            "Rename or delete the duplicate items and restart the application."
+        )
+    
+    logger.info("Replacing index %s on items.name with a unique index", name_index.name)
+    if name_index.name in existing_indexes:
+        name_index.drop(conn)
+    name_index.create(conn)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create database tables and compile templates on startup"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(ensure_unique_item_names)
+    templates.env.get_template("index.html")
+    yield
+    await engine.dispose()
 
-app = FastAPI(title="FastAPI CRUD with Excel Export", version="1.0.0")
+app = FastAPI(
+    title="FastAPI CRUD with Excel Export",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # templates folder setup
 templates = Jinja2Templates(directory="templates")
+# Templates don't change at runtime: skip per-request mtime checks and cache
+# bytecode across restarts (index.html is compiled in lifespan)
+templates.env.auto_reload = False
+templates.env.bytecode_cache = FileSystemBytecodeCache()
 
 # Static files mount removed since no external CSS/JS files are used
 
+# Fixed Excel column widths (ID, Name, Description, last instruction column)
+EXCEL_COLUMN_WIDTHS = {"A": 8, "B": 30, "C": 50, "D": 40}
+
+# Chunk and buffer size used when spooling uploads to disk (256 KiB)
+UPLOAD_CHUNK_SIZE = 1 << 18
+
+# Statements built once at import and reused on every request
+ITEM_ROWS_STMT = select(models.Item.id, models.Item.name, models.Item.description)
+EXISTING_IDS_STMT = select(models.Item.id).where(models.Item.id.in_(bindparam("ids", expanding=True)))
+NAMES_BY_ID_STMT = select(models.Item.id, models.Item.name).where(models.Item.id.in_(bindparam("ids", expanding=True)))
+IDS_BY_NAME_STMT = select(models.Item.name, models.Item.id).where(models.Item.name.in_(bindparam("names", expanding=True)))
+UPSERT_BY_NAME_STMT = sqlite_insert(models.Item)
+UPSERT_BY_NAME_STMT = UPSERT_BY_NAME_STMT.on_conflict_do_update(
+    index_elements=[models.Item.name],
+    set_={"description": UPSERT_BY_NAME_STMT.excluded.description}
+)
+
 # ✅ HTML page
 @app.get("/", response_class=HTMLResponse)
-def home(request: Request, db: Session = Depends(get_db)):
-    items = db.query(models.Item).all()
+async def home(request: Request, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(ITEM_ROWS_STMT)
+    items = result.all()
     return templates.TemplateResponse("index.html", {"request": request, "items": items})
 
 @app.get("/health")
@@ -49,108 +118,151 @@ def get_robots():
 
 # ✅ REST APIs (same as before)...
 @app.post("/items/", response_model=schemas.ItemResponse)
-def create_item(item: schemas.ItemCreate, db: Session = Depends(get_db)):
+async def create_item(item: schemas.ItemCreate, db: AsyncSession = Depends(get_db)):
     db_item = models.Item(name=item.name, description=item.description)
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="An item with this name already exists")
+    await db.refresh(db_item)
     return db_item
 
-@app.get("/items/", response_model=list[schemas.ItemResponse])
-def read_items(db: Session = Depends(get_db)):
-    return db.query(models.Item).all()
+@app.get("/items/", response_model=None, responses={200: {"model": list[schemas.ItemResponse]}})
+async def read_items(db: AsyncSession = Depends(get_db)):
+    # Rows come straight from the database, so skip response validation and encoding
+    result = await db.execute(ITEM_ROWS_STMT)
+    return ORJSONResponse([
+        {"id": item_id, "name": name, "description": description}
+        for item_id, name, description in result
+    ])
 
 @app.put("/items/{item_id}", response_model=schemas.ItemResponse)
-def update_item(item_id: int, item: schemas.ItemCreate, db: Session = Depends(get_db)):
-    db_item = db.query(models.Item).filter(models.Item.id == item_id).first()
+async def update_item(item_id: int, item: schemas.ItemCreate, db: AsyncSession = Depends(get_db)):
+    db_item = await db.get(models.Item, item_id)
     if not db_item:
         raise HTTPException(status_code=404, detail="Item not found")
     
     db_item.name = item.name
     db_item.description = item.description
-    db.commit()
-    db.refresh(db_item)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="An item with this name already exists")
+    await db.refresh(db_item)
     return db_item
 
 @app.delete("/items/group")
-def delete_multiple_items(request: schemas.GroupDeleteRequest, db: Session = Depends(get_db)):
+async def delete_multiple_items(request: schemas.GroupDeleteRequest, db: AsyncSession = Depends(get_db)):
     """Delete multiple items by their IDs"""
-    logging.info(f"Group delete request received for IDs: {request.item_ids}")
-    
-    if not request.item_ids:
-        logging.warning("No item IDs provided in request")
-        raise HTTPException(status_code=400, detail="No item IDs provided")
+    logger.info("Group delete request received for IDs: %s", request.item_ids)
     
-    # Validate that all IDs are positive integers
-    if any(id <= 0 for id in request.item_ids):
-        logging.warning(f"Invalid IDs found: {[id for id in request.item_ids if id <= 0]}")
-        raise HTTPException(status_code=400, detail="All item IDs must be positive integers")
+    # Find which of the requested IDs exist (duplicates are collapsed)
+    requested_ids = set(request.item_ids)
+    result = await db.execute(EXISTING_IDS_STMT, {"ids": list(requested_ids)})
+    existing_ids = set(result.scalars())
+    logger.info("Found %d items to delete", len(existing_ids))
     
-    # Find and delete all items with the specified IDs
-    items_to_delete = db.query(models.Item).filter(models.Item.id.in_(request.item_ids)).all()
-    logging.info(f"Found {len(items_to_delete)} items to delete")
-    
-    if not items_to_delete:
-        logging.warning(f"No items found for IDs: {request.item_ids}")
+    if not existing_ids:
+        logger.warning("No items found for IDs: %s", request.item_ids)
         raise HTTPException(status_code=404, detail="No items found with the provided IDs")
     
     # Check if some IDs were not found
-    found_ids = [item.id for item in items_to_delete]
-    not_found_ids = [id for id in request.item_ids if id not in found_ids]
+    not_found_ids = sorted(requested_ids - existing_ids)
     
     if not_found_ids:
-        logging.warning(f"Some IDs not found: {not_found_ids}")
+        logger.warning("Some IDs not found: %s", not_found_ids)
         raise HTTPException(
             status_code=404, 
             detail=f"Items with IDs {not_found_ids} not found"
         )
     
-    # Delete all found items
-    for item in items_to_delete:
-        db.delete(item)
-        logging.info(f"Deleted item with ID: {item.id}")
-    
-    db.commit()
-    logging.info(f"Successfully deleted {len(items_to_delete)} items")
-    return {"message": f"Successfully deleted {len(items_to_delete)} items"}
+    # Delete all found items with a single DELETE statement
+    await db.execute(
+        delete(models.Item).where(models.Item.id.in_(existing_ids)).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    logger.info("Successfully deleted %d items", len(existing_ids))
+    return {"message": f"Successfully deleted {len(existing_ids)} items"}
 
 @app.delete("/items/{item_id}")
-def delete_item(item_id: int, db: Session = Depends(get_db)):
-    item = db.query(models.Item).filter(models.Item.id == item_id).first()
+async def delete_item(item_id: int, db: AsyncSession = Depends(get_db)):
+    item = await db.get(models.Item, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    db.delete(item)
-    db.commit()
+    await db.delete(item)
+    await db.commit()
     return {"message": "Item deleted successfully"}
 
-@app.get("/download-excel-template")
-def download_excel_template():
-    """Download Excel template with field names and instructions"""
-    # Create a new workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Items Template"
+# Excel cell styles, shared by every download instead of rebuilt per request
+INSTRUCTION_FONT = Font(bold=True, color="FFFFFF", size=10)
+INSTRUCTION_ALIGNMENT = Alignment(horizontal="left", vertical="center")
+TEMPLATE_INSTRUCTION_FILL = PatternFill(start_color="FF6B35", end_color="FF6B35", fill_type="solid")
+DATA_INSTRUCTION_FILL = PatternFill(start_color="4CAF50", end_color="4CAF50", fill_type="solid")
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+
+def create_items_sheet(title, instructions, instruction_fill):
+    """Create a write-only workbook with the instructions and header rows already added"""
+    # Create a new write-only workbook (rows are streamed, not kept in memory)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
     
-    # Add instructions row
-    ws.cell(row=1, column=1, value="📝 INSTRUCTIONS:")
-    ws.cell(row=1, column=2, value="• Leave ID empty for new items")
-    ws.cell(row=1, column=3, value="• Use existing ID to edit that item")
-    ws.cell(row=1, column=4, value="• Invalid IDs fall back to name matching")
+    # Column widths must be set before the first row is appended
+    for column_letter, width in EXCEL_COLUMN_WIDTHS.items():
+        ws.column_dimensions[column_letter].width = width
     
-    # Style instructions row
-    for col in range(1, 5):
-        cell = ws.cell(row=1, column=col)
-        cell.font = Font(bold=True, color="FFFFFF", size=10)
-        cell.fill = PatternFill(start_color="FF6B35", end_color="FF6B35", fill_type="solid")
-        cell.alignment = Alignment(horizontal="left", vertical="center")
+    # Add styled instructions row
+    instruction_cells = []
+    for value in instructions:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = INSTRUCTION_FONT
+        cell.fill = instruction_fill
+        cell.alignment = INSTRUCTION_ALIGNMENT
+        instruction_cells.append(cell)
+    ws.append(instruction_cells)
+    ws.append([])
     
     # Add headers with styling
     headers = ["ID", "Name", "Description"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=3, column=col, value=header)
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        cell.alignment = Alignment(horizontal="center", vertical="center")
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = HEADER_ALIGNMENT
+        header_cells.append(cell)
+    ws.append(header_cells)
+    
+    return wb, ws
+
+def append_rows(ws, rows):
+    """Append database rows to a write-only worksheet"""
+    for row in rows:
+        ws.append(list(row))
+
+def save_workbook(wb):
+    """Save a workbook to an in-memory buffer, rewound for reading"""
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+def build_excel_template():
+    """Build the Excel template file and return its bytes"""
+    wb, ws = create_items_sheet(
+        "Items Template",
+        [
+            "📝 INSTRUCTIONS:",
+            "• Leave ID empty for new items",
+            "• Use existing ID to edit that item",
+            "• Invalid IDs fall back to name matching"
+        ],
+        TEMPLATE_INSTRUCTION_FILL
+    )
     
     # Add sample data rows
     sample_data = [
@@ -159,119 +271,79 @@ def download_excel_template():
         ["", "Another New Item", "This will create another new item"]
     ]
     
-    for row_idx, (excel_id, name, desc) in enumerate(sample_data, 4):
-        ws.cell(row=row_idx, column=1, value=excel_id)
-        ws.cell(row=row_idx, column=2, value=name)
-        ws.cell(row=row_idx, column=3, value=desc)
+    for row in sample_data:
+        ws.append(row)
     
-    # Auto-adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Save to temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-        wb.save(tmp.name)
-        tmp_path = tmp.name
-    
-    return FileResponse(
-        path=tmp_path,
-        filename="items_template.xlsx",
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    return save_workbook(wb).getvalue()
+
+# The template has no per-request data, so it is built once at startup
+EXCEL_TEMPLATE_BYTES = build_excel_template()
+
+@app.get("/download-excel-template")
+def download_excel_template():
+    """Download Excel template with field names and instructions"""
+    return Response(
+        content=EXCEL_TEMPLATE_BYTES,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": 'attachment; filename="items_template.xlsx"'}
     )
 
 @app.get("/download-excel-data")
-def download_excel_data(db: Session = Depends(get_db)):
+async def download_excel_data(db: AsyncSession = Depends(get_db)):
     """Download all items data as Excel file with editing instructions"""
-    # Get all items from database
-    items = db.query(models.Item).all()
-    
-    # Create a new workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Items Data"
-    
-    # Add instructions row
-    ws.cell(row=1, column=1, value="📝 EDITING INSTRUCTIONS:")
-    ws.cell(row=1, column=2, value="• Edit Name/Description to update existing items")
-    ws.cell(row=1, column=3, value="• Leave ID empty for new items")
-    ws.cell(row=1, column=4, value="• Upload back to apply changes")
-    
-    # Style instructions row
-    for col in range(1, 5):
-        cell = ws.cell(row=1, column=col)
-        cell.font = Font(bold=True, color="FFFFFF", size=10)
-        cell.fill = PatternFill(start_color="4CAF50", end_color="4CAF50", fill_type="solid")
-        cell.alignment = Alignment(horizontal="left", vertical="center")
-    
-    # Add headers with styling
-    headers = ["ID", "Name", "Description"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=3, column=col, value=header)
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Add data rows
-    for row, item in enumerate(items, 4):
-        ws.cell(row=row, column=1, value=item.id)
-        ws.cell(row=row, column=2, value=item.name)
-        ws.cell(row=row, column=3, value=item.description)
+    wb, ws = create_items_sheet(
+        "Items Data",
+        [
+            "📝 EDITING INSTRUCTIONS:",
+            "• Edit Name/Description to update existing items",
+            "• Leave ID empty for new items",
+            "• Upload back to apply changes"
+        ],
+        DATA_INSTRUCTION_FILL
+    )
     
-    # Auto-adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
+    # Stream data rows from the database in batches instead of loading them all;
+    # fetching whole partitions avoids an await (and greenlet switch) per row.
+    # Writing and saving the workbook is CPU-bound, so it runs in the threadpool
+    result = await db.stream(
+        ITEM_ROWS_STMT.execution_options(yield_per=1000)
+    )
+    async for partition in result.partitions():
+        await run_in_threadpool(append_rows, ws, partition)
     
-    # Save to temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-        wb.save(tmp.name)
-        tmp_path = tmp.name
+    buffer = await run_in_threadpool(save_workbook, wb)
     
-    return FileResponse(
-        path=tmp_path,
-        filename="items_data.xlsx",
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    return Response(
+        content=buffer.getvalue(),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": 'attachment; filename="items_data.xlsx"'}
     )
 
 @app.post("/upload-excel")
-async def upload_excel(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def upload_excel(file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
     """Upload Excel file and import data - ID-based editing with fallback to name matching"""
     if not file.filename.endswith('.xlsx'):
         raise HTTPException(status_code=400, detail="Only .xlsx files are allowed")
     
+    tmp_path = None
+    wb = None
     try:
-        # Read the uploaded file
-        contents = await file.read()
-        
-        # Create a temporary file to work with openpyxl
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-            tmp.write(contents)
+        # Stream the upload to a temporary file in chunks instead of reading it all into memory
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx', buffering=UPLOAD_CHUNK_SIZE) as tmp:
             tmp_path = tmp.name
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                tmp.write(chunk)
         
-        # Open the workbook
-        wb = openpyxl.load_workbook(tmp_path)
+        # Open the workbook in read-only mode so rows are parsed lazily
+        wb = openpyxl.load_workbook(tmp_path, read_only=True, data_only=True)
         ws = wb.active
+        # Don't trust the stored sheet dimensions, some writers get them wrong
+        ws.reset_dimensions()
         
         # Determine starting row based on file structure
         # Check if first row contains instructions
-        first_row_value = ws.cell(row=1, column=1).value
+        first_row = next(ws.iter_rows(max_row=1, values_only=True), ())
+        first_row_value = first_row[0] if first_row else None
         if first_row_value and "INSTRUCTIONS" in str(first_row_value):
             start_row = 4  # Skip instruction row + header row
         else:
@@ -282,86 +354,71 @@ async def upload_excel(file: UploadFile = File(...), db: Session = Depends(get_d
         updated_count = 0
         skipped_count = 0
         
-        for row_num, row in enumerate(ws.iter_rows(min_row=start_row, values_only=True), start=start_row):
+        # Parse all rows first as (row_num, item_id, name, description)
+        rows = []
+        # With reset dimensions rows are not padded, max_col pads them to ID/Name/Description
+        for row_num, row in enumerate(ws.iter_rows(min_row=start_row, max_col=3, values_only=True), start=start_row):
             # Skip empty rows
             if not any(row):
                 continue
                 
             # Extract values from row
-            excel_id = row[0] if row[0] is not None else None
+            excel_id = row[0]
             name = row[1].strip() if row[1] else ""
             description = row[2].strip() if row[2] else ""
             
             # Validate required fields
             if not name or not description:
-                logging.warning(f"Row {row_num}: Missing name or description, skipping")
+                logger.warning("Row %d: Missing name or description, skipping", row_num)
                 skipped_count += 1
                 continue
             
-            # ID-based editing logic
+            # ID-based editing, invalid IDs fall back to name matching
+            item_id = None
             if excel_id is not None and excel_id != "":
                 try:
-                    # Try to find item by ID first
-                    existing_item = db.query(models.Item).filter(models.Item.id == int(excel_id)).first()
-                    
-                    if existing_item:
-                        # Update existing item by ID
-                        existing_item.name = name
-                        existing_item.description = description
-                        updated_count += 1
-                        logging.info(f"Updated item by ID {excel_id}: {name}")
-                    else:
-                        # ID not found, create new item with specified ID (if possible)
-                        try:
-                            # Try to create item with the specified ID
-                            new_item = models.Item(id=int(excel_id), name=name, description=description)
-                            db.add(new_item)
-                            imported_count += 1
-                            logging.info(f"Created new item with ID {excel_id}: {name}")
-                        except Exception as id_error:
-                            # If ID assignment fails, create with auto-generated ID
-                            logging.warning(f"Could not assign ID {excel_id}, creating with auto-generated ID: {str(id_error)}")
-                            new_item = models.Item(name=name, description=description)
-                            db.add(new_item)
-                            imported_count += 1
-                            logging.info(f"Created new item with auto-generated ID: {name}")
+                    item_id = int(excel_id)
                 except (ValueError, TypeError):
-                    # Invalid ID format, fall back to name matching
-                    logging.warning(f"Invalid ID format '{excel_id}' in row {row_num}, falling back to name matching")
-                    existing_item = db.query(models.Item).filter(models.Item.name == name).first()
-                    
-                    if existing_item:
-                        # Update existing item by name
-                        existing_item.description = description
-                        updated_count += 1
-                        logging.info(f"Updated existing item by name: {name}")
-                    else:
-                        # Create new item
-                        new_item = models.Item(name=name, description=description)
-                        db.add(new_item)
-                        imported_count += 1
-                        logging.info(f"Created new item: {name}")
-            else:
-                # No ID provided, use name matching
-                existing_item = db.query(models.Item).filter(models.Item.name == name).first()
-                
-                if existing_item:
-                    # Update existing item by name
-                    existing_item.description = description
-                    updated_count += 1
-                    logging.info(f"Updated existing item by name: {name}")
-                else:
-                    # Create new item
-                    new_item = models.Item(name=name, description=description)
-                    db.add(new_item)
-                    imported_count += 1
-                    logging.info(f"Created new item: {name}")
+                    logger.warning("Invalid ID format '%s' in row %d, falling back to name matching", excel_id, row_num)
+            
+            rows.append((row_num, item_id, name, description))
         
-        # Commit all changes
-        db.commit()
+        # Resolve existing items with two bulk queries instead of one query per row
+        ids = {item_id for _, item_id, _, _ in rows if item_id is not None}
+        names = {name for _, _, name, _ in rows}
+        current_names = {}
+        owners = {}
+        if ids:
+            result = await db.execute(NAMES_BY_ID_STMT, {"ids": list(ids)})
+            current_names = {item_id: name for item_id, name in result}
+        if names:
+            result = await db.execute(IDS_BY_NAME_STMT, {"names": list(names)})
+            owners = {name: item_id for name, item_id in result}
+        
+        # Decide how each row is applied, then clear the old names of renamed
+        # items first so renames between rows don't collide
+        plan = plan_import(rows, current_names, owners)
+        imported_count += plan.imported_count
+        updated_count += plan.updated_count
+        skipped_count += plan.skipped_count
+        if plan.renamed_ids:
+            await db.execute(
+                update(models.Item)
+                .where(models.Item.id.in_(plan.renamed_ids))
+                .values(name=None)
+                .execution_options(synchronize_session=False)
+            )
         
-        # Clean up temporary file
-        os.unlink(tmp_path)
+        # Apply all updates and inserts as executemany batches
+        if plan.updates:
+            await db.execute(update(models.Item), plan.updates)
+        if plan.inserts:
+            await db.execute(insert(models.Item), plan.inserts)
+        if plan.upserts:
+            await db.execute(UPSERT_BY_NAME_STMT, plan.upserts)
+        
+        # Commit all changes
+        await db.commit()
         
         # Build detailed message
         message_parts = []
@@ -373,15 +430,25 @@ async def upload_excel(file: UploadFile = File(...), db: Session = Depends(get_d
             message_parts.append(f"{skipped_count} rows skipped")
         
         message = f"Successfully processed Excel file: {', '.join(message_parts)}"
-        logging.info(message)
+        logger.info(message)
         return {"message": message}
         
+    except IntegrityError as e:
+        await db.rollback()
+        logger.error("Excel upload conflicts with existing items: %s", e)
+        raise HTTPException(
+            status_code=400,
+            detail="Excel data conflicts with existing items (duplicate name or ID). Download the latest data and try again."
+        )
     except Exception as e:
-        # Clean up temporary file in case of error
-        if 'tmp_path' in locals():
-            os.unlink(tmp_path)
-        logging.error(f"Error processing Excel file: {str(e)}")
+        logger.error("Error processing Excel file: %s", e)
         raise HTTPException(status_code=500, detail=f"Error processing Excel file: {str(e)}")
+    finally:
+        # Release the zip handle and clean up the temporary file
+        if wb is not None:
+            wb.close()
+        if tmp_path is not None:
+            os.unlink(tmp_path)
 
 # Catch-all endpoint for 404 requests
 @app.exception_handler(404)
@@ -389,7 +456,10 @@ async def not_found_handler(request: Request, exc: HTTPException):
     """Handle 404 errors gracefully"""
     if request.url.path in ["/favicon.ico", "/robots.txt"]:
         return Response(status_code=204)
-    return {"detail": "Not found", "path": request.url.path}
+    # A matched route raised its own 404, keep its message
+    if "endpoint" in request.scope:
+        return ORJSONResponse(status_code=404, content={"detail": exc.detail}, headers=getattr(exc, "headers", None))
+    return ORJSONResponse(status_code=404, content={"detail": "Not found", "path": request.url.path})
 
 if __name__ == "__main__":
     import uvicorn
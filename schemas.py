@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, conlist, field_validator
 
 class ItemBase(BaseModel):
     name: str
@@ -14,7 +14,7 @@ class ItemResponse(ItemBase):
         from_attributes = True
 
 class GroupDeleteRequest(BaseModel):
-    item_ids: list[int]
+    item_ids: conlist(int, min_length=1)
     
     class Config:
         json_schema_extra = {
@@ -23,10 +23,9 @@ class GroupDeleteRequest(BaseModel):
             }
         }
     
+    @field_validator("item_ids")
     @classmethod
     def validate_item_ids(cls, v):
-        if not v:
-            raise ValueError("item_ids cannot be empty")
         if any(id <= 0 for id in v):
             raise ValueError("All item IDs must be positive integers")
         return v
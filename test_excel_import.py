@@ -0,0 +1,110 @@
+import unittest
+
+from excel_import import plan_import
+
+class PlanImportTests(unittest.TestCase):
+    def test_new_rows_by_name_and_id(self):
+        rows = [(4, None, "a", "desc a"), (5, 50, "b", "desc b")]
+        plan = plan_import(rows, current_names={}, owners={})
+        self.assertEqual(plan.upserts, [{"name": "a", "description": "desc a"}])
+        self.assertEqual(plan.inserts, [{"id": 50, "name": "b", "description": "desc b"}])
+        self.assertEqual(plan.updates, [])
+        self.assertEqual((plan.imported_count, plan.updated_count, plan.skipped_count), (2, 0, 0))
+
+    def test_update_existing_by_id_and_name(self):
+        rows = [(4, 1, "a2", "new a"), (5, None, "b", "new b")]
+        plan = plan_import(rows, current_names={1: "a"}, owners={"b": 2})
+        self.assertCountEqual(plan.updates, [
+            {"id": 1, "name": "a2", "description": "new a"},
+            {"id": 2, "description": "new b"},
+        ])
+        self.assertEqual(plan.renamed_ids, [1])
+        self.assertEqual((plan.imported_count, plan.updated_count, plan.skipped_count), (0, 2, 0))
+
+    def test_unchanged_name_is_not_renamed(self):
+        rows = [(4, 1, "a", "new a")]
+        plan = plan_import(rows, current_names={1: "a"}, owners={"a": 1})
+        self.assertEqual(plan.updates, [{"id": 1, "description": "new a"}])
+        self.assertEqual(plan.renamed_ids, [])
+
+    def test_name_swap_between_existing_ids(self):
+        rows = [(4, 1, "b", "now b"), (5, 2, "a", "now a")]
+        plan = plan_import(rows, current_names={1: "a", 2: "b"}, owners={"a": 1, "b": 2})
+        self.assertCountEqual(plan.renamed_ids, [1, 2])
+        self.assertCountEqual(plan.updates, [
+            {"id": 1, "name": "b", "description": "now b"},
+            {"id": 2, "name": "a", "description": "now a"},
+        ])
+        self.assertEqual((plan.imported_count, plan.updated_count, plan.skipped_count), (0, 2, 0))
+
+    def test_rename_to_name_held_by_other_item_is_skipped(self):
+        rows = [(4, 1, "b", "desc")]
+        plan = plan_import(rows, current_names={1: "a"}, owners={"b": 2})
+        self.assertEqual(plan.updates, [])
+        self.assertEqual(plan.renamed_ids, [])
+        self.assertEqual((plan.imported_count, plan.updated_count, plan.skipped_count), (0, 0, 1))
+
+    def test_rejected_rename_keeps_name_and_rejects_chain(self):
+        # 2 can't take "c" (held by 3), so it keeps "b" and 1 can't take "b"
+        rows = [(4, 1, "b", "d1"), (5, 2, "c", "d2")]
+        plan = plan_import(rows, current_names={1: "a", 2: "b"}, owners={"b": 2, "c": 3})
+        self.assertEqual(plan.updates, [])
+        self.assertEqual(plan.skipped_count, 2)
+
+    def test_two_ids_renamed_to_same_name(self):
+        rows = [(4, 1, "x", "d1"), (5, 2, "x", "d2")]
+        plan = plan_import(rows, current_names={1: "a", 2: "b"}, owners={})
+        self.assertEqual(plan.updates, [{"id": 1, "name": "x", "description": "d1"}])
+        self.assertEqual(plan.skipped_count, 1)
+
+    def test_unknown_id_with_taken_name_falls_back_to_name_matching(self):
+        rows = [(4, 50, "a", "new a")]
+        plan = plan_import(rows, current_names={}, owners={"a": 1})
+        self.assertEqual(plan.inserts, [])
+        self.assertEqual(plan.updates, [{"id": 1, "description": "new a"}])
+        self.assertEqual((plan.imported_count, plan.updated_count, plan.skipped_count), (0, 1, 0))
+
+    def test_repeated_new_id_updates_pending_item(self):
+        rows = [(4, 50, "a", "first"), (5, 50, "b", "second")]
+        plan = plan_import(rows, current_names={}, owners={})
+        self.assertEqual(plan.inserts, [{"id": 50, "name": "b", "description": "second"}])
+        self.assertEqual((plan.imported_count, plan.updated_count), (1, 1))
+
+    def test_repeated_new_id_renamed_to_taken_name_is_skipped(self):
+        rows = [(4, 50, "a", "first"), (5, 50, "b", "second")]
+        plan = plan_import(rows, current_names={}, owners={"b": 2})
+        self.assertEqual(plan.inserts, [{"id": 50, "name": "a", "description": "first"}])
+        self.assertEqual(plan.skipped_count, 1)
+
+    def test_repeated_name_updates_pending_item(self):
+        rows = [(4, None, "a", "first"), (5, None, "a", "second")]
+        plan = plan_import(rows, current_names={}, owners={})
+        self.assertEqual(plan.upserts, [{"name": "a", "description": "second"}])
+        self.assertEqual((plan.imported_count, plan.updated_count), (1, 1))
+
+    def test_name_row_matches_item_created_by_id_row(self):
+        rows = [(4, 5, "c", "by id"), (5, None, "c", "by name"), (6, None, "d", "new")]
+        plan = plan_import(rows, current_names={}, owners={})
+        self.assertEqual(plan.inserts, [{"id": 5, "name": "c", "description": "by name"}])
+        self.assertEqual(plan.upserts, [{"name": "d", "description": "new"}])
+        self.assertEqual((plan.imported_count, plan.updated_count), (2, 1))
+
+    def test_name_row_matches_item_renamed_by_id_row(self):
+        rows = [(4, 1, "z", "renamed"), (5, None, "z", "by name"), (6, None, "a", "old name")]
+        plan = plan_import(rows, current_names={1: "a"}, owners={"a": 1})
+        self.assertEqual(plan.updates, [{"id": 1, "name": "z", "description": "by name"}])
+        # The old name is free again, so it creates a new item
+        self.assertEqual(plan.upserts, [{"name": "a", "description": "old name"}])
+        self.assertEqual((plan.imported_count, plan.updated_count), (1, 2))
+
+    def test_reupload_of_unchanged_export(self):
+        current = {i: f"item {i}" for i in range(1, 2001)}
+        rows = [(i + 3, i, name, f"desc {i}") for i, name in current.items()]
+        owners = {name: i for i, name in current.items()}
+        plan = plan_import(rows, current_names=current, owners=owners)
+        self.assertEqual(plan.renamed_ids, [])
+        self.assertEqual(len(plan.updates), 2000)
+        self.assertEqual((plan.imported_count, plan.updated_count, plan.skipped_count), (0, 2000, 0))
+
+if __name__ == "__main__":
+    unittest.main()